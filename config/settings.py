@@ -9,8 +9,18 @@ EVENT_LOG_FILE = os.path.join(LOG_DIR, "events.jsonl")
 
 # Detection Config
 YOLO_MODEL_PATH = "yolo11n.pt" 
+YOLO_HALF_PRECISION = True  # FP16 inference when running on a CUDA GPU
+YOLO_IMGSZ = 640  # Inference input size (square letterbox)
+# Pinned-memory GPU upload for webcam inference, TensorRT engines only. Off until
+# `python -m detectors.yolo_wrapper --benchmark-input 0` shows it wins on the target GPU
+YOLO_PINNED_INPUT = False
+YOLO_BATCH_SIZE = 8  # Frames per YOLO call for video files; also the TensorRT engine's max batch
 CONFIDENCE_THRESHOLD = 0.5
 
+# Skip inference on unchanged frames (mean abs diff of a 16x16 gray thumbnail)
+STATIC_FRAME_DIFF_THRESHOLD = 2.0
+STATIC_FRAME_REFRESH_INTERVAL = 30  # Force inference at least every N frames
+
 # Lane boundaries (x‑coordinates). Empty list means auto‑split into two equal lanes.
 LANE_BOUNDARIES = []  # e.g. [300, 600] for three‑lane road
 
@@ -0,0 +1,115 @@
+"""
+Threaded Video Capture
+Decodes frames on a dedicated thread so decoding overlaps with detection
+"""
+import cv2
+import threading
+from typing import List, Optional
+from core.frame_ring import SPSCFrameRing
+
+
+def open_capture(source) -> cv2.VideoCapture:
+    """Open a video source, requesting FFmpeg hardware decoding for files"""
+    if isinstance(source, str) and hasattr(cv2, "CAP_PROP_HW_ACCELERATION"):
+        cap = cv2.VideoCapture(source, cv2.CAP_FFMPEG,
+                               [cv2.CAP_PROP_HW_ACCELERATION, cv2.VIDEO_ACCELERATION_ANY])
+        if cap.isOpened():
+            return cap
+        cap.release()
+    return cv2.VideoCapture(source)
+
+
+class ThreadedCapture:
+    """
+    cv2.VideoCapture look-alike whose frames are decoded by a background thread
+    and handed over through an SPSCFrameRing (decoder produces, caller consumes).
+
+    File sources are lossless: the decoder waits while the ring is full. Live
+    cameras (int sources) never stall the device; the decoder overwrites the
+    oldest unread frame and read() always returns the newest frame.
+    Both sides block on the ring's condition variable rather than polling.
+
+    A frame returned by read()/read_batch() is a ring slot that stays valid
+    until the next read()/read_batch() call.
+    """
+
+    def __init__(self, source, ring_size: int = 4):
+        self.source = source
+        self.cap = open_capture(source)
+        self.latest_only = isinstance(source, int)
+        self.ring = SPSCFrameRing(ring_size)
+        self._stop = threading.Event()
+        self._eof = False
+        self._thread = None
+
+    def isOpened(self) -> bool:
+        return self.cap.isOpened()
+
+    def get(self, prop_id):
+        return self.cap.get(prop_id)
+
+    def start(self):
+        """Start the decoder thread (called implicitly by the first read)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._decoder_loop, daemon=True)
+            self._thread.start()
+
+    def _decoder_loop(self):
+        """Producer: decode frames and publish them into the ring"""
+        ring = self.ring
+        while not self._stop.is_set():
+            ret, frame = self.cap.read()
+            if not ret:
+                break
+            if self.latest_only:
+                ring.publish_latest(frame)
+                continue
+            if not ring.has_space(frame):
+                with ring.changed:
+                    ring.changed.wait_for(lambda: ring.has_space(frame) or self._stop.is_set())
+                if self._stop.is_set():
+                    break
+            ring.try_publish(frame)
+        self._eof = True
+        ring.notify()
+
+    def _next(self) -> Optional[object]:
+        """Consumer: wait for the next frame, None once the source is exhausted"""
+        ring = self.ring
+        pop = ring.pop_latest if self.latest_only else ring.pop
+        while True:
+            eof = self._eof  # read before popping so no final frame is missed
+            frame = pop()
+            if frame is not None or eof or self._stop.is_set():
+                return frame
+            with ring.changed:
+                # Our pops may have unblocked a decoder waiting to resize the ring
+                ring.changed.notify_all()
+                ring.changed.wait_for(lambda: ring.readable() or self._eof or self._stop.is_set())
+
+    def read(self):
+        """Return (ok, frame) like cv2.VideoCapture.read"""
+        self.start()
+        self.ring.release()
+        frame = self._next()
+        return frame is not None, frame
+
+    def read_batch(self, n: int) -> List[object]:
+        """Return up to n frames (fewer only at end of stream); n must not exceed the ring size"""
+        self.start()
+        self.ring.release()
+        batch = []
+        while len(batch) < n:
+            frame = self._next()
+            if frame is None:
+                break
+            batch.append(frame)
+        return batch
+
+    def release(self):
+        """Stop the decoder thread and release the underlying capture"""
+        self._stop.set()
+        self.ring.notify()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=2.0)
+        self.cap.release()
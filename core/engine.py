@@ -46,9 +46,8 @@ class TrafficSafetyEngine:
                 try:
                     events = detector.process(frame, self.frame_id)
                     # 2. Publish Events
+                    bus.publish_batch(events)
                     for event in events:
-                        bus.publish(event)
-                        
                         # VISUALIZATION (Simple: Draw on frame for now)
                         # In a real app, this should be decoupled, but for debugging/demo we draw here.
                         # Note: `detector.process` doesn't currently return bbox, so we need to rely on the detector to draw 
@@ -9,6 +9,7 @@ class EventBus:
     """
     def __init__(self):
         self._subscribers: Dict[str, List[Callable[[Event], None]]] = {}
+        self._batch_subscribers: List[Callable[[List[Event]], None]] = []
         self._lock = threading.Lock()
 
     def subscribe(self, event_type: str, handler: Callable[[Event], None]):
@@ -22,18 +23,43 @@ class EventBus:
         """Subscribe a handler to ALL events (wildcard)."""
         self.subscribe("*", handler)
 
+    def subscribe_batch(self, handler: Callable[[List[Event]], None]):
+        """Subscribe a handler to ALL events, receiving each published batch as a list."""
+        with self._lock:
+            self._batch_subscribers.append(handler)
+
     def publish(self, event: Event):
         """Publish an event to all subscribers."""
-        # direct match
-        handlers = self._subscribers.get(event.event_type, [])
-        # wildcard match
-        handlers.extend(self._subscribers.get("*", []))
+        self.publish_batch([event])
 
-        for handler in handlers:
+    def publish_batch(self, events: List[Event]):
+        """Publish a list of events, snapshotting subscribers once for the whole batch."""
+        if not events:
+            return
+        with self._lock:
+            batch_handlers = list(self._batch_subscribers)
+            wildcard = self._subscribers.get("*", [])
+            # Copy only the handler lists of event types present in this batch,
+            # each pre-joined with the wildcard handlers (direct + wildcard match)
+            handlers_by_type = {}
+            for event in events:
+                event_type = event.event_type
+                if event_type not in handlers_by_type:
+                    typed = self._subscribers.get(event_type, []) if event_type != "*" else []
+                    handlers_by_type[event_type] = typed + wildcard
+
+        for handler in batch_handlers:
             try:
-                handler(event)
+                handler(events)
             except Exception as e:
                 logging.error(f"Error in event handler {handler.__name__}: {e}")
 
+        for event in events:
+            for handler in handlers_by_type[event.event_type]:
+                try:
+                    handler(event)
+                except Exception as e:
+                    logging.error(f"Error in event handler {handler.__name__}: {e}")
+
 # Global instance
 bus = EventBus()
@@ -1,23 +1,64 @@
 from dataclasses import dataclass, field
 from datetime import datetime
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterable, Optional
+import json
+import logging
 import uuid
 
-@dataclass
+try:
+    import orjson
+
+    def dumps_json(obj: Any) -> bytes:
+        """Serialize to compact UTF-8 JSON (orjson fast path)."""
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+except ImportError:
+    def dumps_json(obj: Any) -> bytes:
+        """Serialize to compact UTF-8 JSON."""
+        return json.dumps(obj, separators=(',', ':')).encode()
+
+def dumps_json_lines(objs: Iterable[Any]) -> bytes:
+    """
+    Serialize objects as JSONL. Each object is encoded on its own, so one
+    unserializable object is logged and skipped without losing the rest.
+    """
+    lines = []
+    for obj in objs:
+        try:
+            lines.append(dumps_json(obj) + b'\n')
+        except (TypeError, ValueError) as e:
+            logging.error(f"Skipping unserializable event: {e}")
+    return b''.join(lines)
+
+# (second, formatted string) of the last timestamp formatted; swapped as one tuple
+_ts_cache = (None, "")
+
+def format_timestamp(t: float) -> str:
+    """Format a UNIX timestamp, reusing the string while the second is unchanged."""
+    global _ts_cache
+    sec = int(t)
+    cached_sec, cached_str = _ts_cache
+    if sec != cached_sec:
+        cached_str = datetime.fromtimestamp(sec).strftime('%Y-%m-%d %H:%M:%S')
+        _ts_cache = (sec, cached_str)
+    return cached_str
+
+@dataclass(slots=True, frozen=True)
 class Event:
     """
     Standard Logic Event Schema for the Traffic Safety System.
+    Immutable and __slots__-based: events are created at high rates and shared
+    across subscribers, so no per-instance __dict__ is kept.
     """
     event_type: str  # e.g., "WRONG_SIDE", "POTHOLE", "EMERGENCY_VEHICLE"
     camera_id: str
     timestamp: float = field(default_factory=lambda: datetime.now().timestamp())
     severity: str = "INFO"  # INFO, WARNING, CRITICAL
-    metadata: Dict[str, Any] = field(default_factory=dict)
+    metadata: Dict[str, Any] = field(default_factory=dict, hash=False)
     event_id: str = field(default_factory=lambda: str(uuid.uuid4()))
 
     @property
     def time_str(self) -> str:
-        return datetime.fromtimestamp(self.timestamp).strftime('%Y-%m-%d %H:%M:%S')
+        return format_timestamp(self.timestamp)
 
     def to_dict(self) -> Dict[str, Any]:
         return {
@@ -1,9 +1,12 @@
 """
 Firebase Firestore client for storing traffic safety events.
 """
+import atexit
 import logging
 import os
-from typing import Dict, Any, Optional
+import threading
+from collections import deque
+from typing import Dict, Any, List, Optional
 
 # Firebase Admin SDK
 try:
@@ -16,18 +19,43 @@ except ImportError:
         "firebase-admin not installed. Run: pip install firebase-admin"
     )
 
+# Transient errors worth retrying; anything else (bad data, permissions) won't succeed later
+try:
+    from google.api_core import exceptions as api_exceptions
+    RETRYABLE_ERRORS = (
+        ConnectionError, TimeoutError,
+        api_exceptions.ServiceUnavailable, api_exceptions.DeadlineExceeded,
+        api_exceptions.InternalServerError, api_exceptions.TooManyRequests,
+        api_exceptions.Aborted,
+    )
+except ImportError:
+    RETRYABLE_ERRORS = (ConnectionError, TimeoutError)
+
 from config import settings
 
 logger = logging.getLogger(__name__)
 
 # Global Firestore client
 _db: Optional[Any] = None
+_collection: Optional[Any] = None  # cached event collection reference
 _initialized = False
 
+# Write-behind queue: detection threads enqueue, a background thread commits
+MAX_BATCH_WRITES = 500  # Firestore limit per batched write
+MAX_PENDING = 50_000  # Oldest queued events are dropped beyond this (JSONL log keeps them)
+MAX_RETRY_DELAY = 60.0  # Seconds, cap for exponential backoff after a failed commit
+MAX_COMMIT_ATTEMPTS = 5  # A batch is dropped after this many failed commits (JSONL log keeps it)
+FLUSH_TIMEOUT = 10.0  # Seconds flush() waits for the queue to drain at exit
+_pending: deque = deque()
+_pending_cv = threading.Condition()
+_in_flight = 0  # events popped by a commit that has not finished yet (guarded by _pending_cv)
+_retry_now = threading.Event()  # cuts a backoff wait short (set by flush)
+_writer_thread: Optional[threading.Thread] = None
+
 
 def initialize_firebase():
     """Initialize Firebase client (call once at startup)."""
-    global _db, _initialized
+    global _db, _collection, _initialized, _writer_thread
     
     if _initialized:
         return
@@ -55,7 +83,12 @@ def initialize_firebase():
             logger.info("Firebase initialized successfully")
         
         _db = firestore.client()
+        _collection = _db.collection(settings.FIREBASE_EVENT_COLLECTION)
         _initialized = True
+        
+        _writer_thread = threading.Thread(target=_writer_loop, daemon=True)
+        _writer_thread.start()
+        atexit.register(flush)
         logger.info(f"Firestore client ready. Collection: {settings.FIREBASE_EVENT_COLLECTION}")
     
     except Exception as e:
@@ -64,27 +97,118 @@ def initialize_firebase():
 
 def save_event(event_dict: Dict[str, Any]) -> bool:
     """
-    Save a single event to Firestore.
+    Queue a single event for Firestore (see save_events).
     
     Args:
         event_dict: Event data dictionary (with 'id' field as document ID)
     
     Returns:
-        True if saved successfully, False otherwise
+        True if queued, False if Firebase is not initialized
+    """
+    return save_events([event_dict])
+
+
+def save_events(event_dicts: List[Dict[str, Any]]) -> bool:
+    """
+    Queue events for Firestore without blocking on the network.
+    A background thread commits them in batched writes.
+    
+    Args:
+        event_dicts: Event data dictionaries (with 'id' field as document ID)
+    
+    Returns:
+        True if queued, False if Firebase is not initialized
     """
     if not _initialized or _db is None:
         return False
     
-    try:
-        doc_id = event_dict.get("id", "unknown")
-        doc_ref = _db.collection(settings.FIREBASE_EVENT_COLLECTION).document(doc_id)
-        doc_ref.set(event_dict)
-        logger.debug(f"✓ Event {doc_id} saved to Firestore")
+    with _pending_cv:
+        _pending.extend(event_dicts)
+        overflow = len(_pending) - MAX_PENDING
+        for _ in range(max(overflow, 0)):
+            _pending.popleft()
+        _pending_cv.notify_all()
+    if overflow > 0:
+        logger.warning(f"Firestore queue full, dropped {overflow} oldest events")
+    return True
+
+
+def _commit_pending(attempt: int = 1) -> bool:
+    """
+    Commit up to MAX_BATCH_WRITES queued events in one batched write.
+    On a transient failure the events are put back at the front of the
+    queue; they are dropped on any other error or once `attempt` reaches
+    MAX_COMMIT_ATTEMPTS.
+    
+    Returns:
+        False if the events were requeued for a retry, True otherwise
+    """
+    global _in_flight
+    with _pending_cv:
+        items = [_pending.popleft() for _ in range(min(len(_pending), MAX_BATCH_WRITES))]
+        _in_flight = len(items)
+    if not items:
         return True
     
+    requeue = False
+    try:
+        batch = _db.batch()
+        for event_dict in items:
+            batch.set(_collection.document(event_dict.get("id", "unknown")), event_dict)
+        batch.commit()
+        logger.debug(f"✓ {len(items)} events saved to Firestore")
+    except RETRYABLE_ERRORS as e:
+        if attempt < MAX_COMMIT_ATTEMPTS:
+            requeue = True
+            logger.warning(f"Failed to save {len(items)} events to Firestore "
+                           f"(attempt {attempt}/{MAX_COMMIT_ATTEMPTS}), will retry: {e}")
+        else:
+            logger.error(f"Dropping {len(items)} events after {attempt} failed Firestore commits: {e}")
     except Exception as e:
-        logger.error(f"Failed to save event to Firestore: {e}")
-        return False
+        logger.error(f"Dropping {len(items)} events, Firestore rejected the batch: {e}")
+    finally:
+        with _pending_cv:
+            if requeue:
+                _pending.extendleft(reversed(items))
+            _in_flight = 0
+            _pending_cv.notify_all()
+    return not requeue
+
+
+def _writer_loop():
+    """Background thread: wait for queued events and commit them in batches."""
+    delay = 0.0
+    attempt = 1  # commit attempt for the batch at the front of the queue
+    while True:
+        with _pending_cv:
+            _pending_cv.wait_for(lambda: _pending)
+        if _commit_pending(attempt):
+            delay = 0.0
+            attempt = 1
+            continue
+        attempt += 1
+        # Back off before retrying a failed commit; flush() can cut this short
+        delay = min(max(delay * 2, 1.0), MAX_RETRY_DELAY)
+        _retry_now.wait(delay)
+        _retry_now.clear()
+
+
+def flush(timeout: float = FLUSH_TIMEOUT) -> bool:
+    """
+    Wait for the writer to commit every queued and in-flight event
+    (called at interpreter exit).
+    
+    Returns:
+        True if the queue drained within timeout
+    """
+    if not _initialized:
+        return True
+    _retry_now.set()
+    with _pending_cv:
+        drained = _pending_cv.wait_for(lambda: not _pending and _in_flight == 0, timeout)
+    if not drained:
+        logger.warning(f"{len(_pending)} events not saved to Firestore before exit")
+    return drained
 
 
 def get_recent_events(limit: int = 100) -> list:
@@ -101,7 +225,7 @@ def get_recent_events(limit: int = 100) -> list:
         return []
     
     try:
-        docs = (_db.collection(settings.FIREBASE_EVENT_COLLECTION)
+        docs = (_collection
                 .order_by("time", direction=firestore.Query.DESCENDING)
                 .limit(limit)
                 .stream())
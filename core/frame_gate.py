@@ -0,0 +1,38 @@
+"""
+Static Frame Gate
+Cheap change detection used to skip inference on unchanged frames
+"""
+import cv2
+from config import settings
+
+
+class StaticFrameGate:
+    """
+    Compares a 16x16 grayscale thumbnail of each frame against the last
+    keyframe (the last frame that was sent to inference). Frames whose mean
+    absolute difference stays below the threshold are reported as static;
+    a refresh is forced every `refresh_interval` frames regardless.
+    """
+
+    def __init__(self, threshold: float = settings.STATIC_FRAME_DIFF_THRESHOLD,
+                 refresh_interval: int = settings.STATIC_FRAME_REFRESH_INTERVAL):
+        self.threshold = threshold
+        self.refresh_interval = refresh_interval
+        self._prev_small = None
+        self._skipped = 0
+
+    def reset(self):
+        self._prev_small = None
+        self._skipped = 0
+
+    def is_static(self, frame) -> bool:
+        """True if inference can be skipped and the previous results reused"""
+        small = cv2.resize(frame, (16, 16), interpolation=cv2.INTER_AREA)
+        gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+        if (self._prev_small is not None and self._skipped < self.refresh_interval
+                and cv2.absdiff(gray, self._prev_small).mean() < self.threshold):
+            self._skipped += 1
+            return True
+        self._prev_small = gray
+        self._skipped = 0
+        return False
@@ -0,0 +1,120 @@
+"""
+Single-Producer / Single-Consumer Frame Ring
+Copy-free hand-off of pre-allocated frame buffers between a producer thread
+and a consumer thread
+"""
+import threading
+import numpy as np
+from typing import Optional
+
+
+class SPSCFrameRing:
+    """
+    Pre-allocated, power-of-two ring of frame buffers.
+
+    Exactly one thread may publish and exactly one thread may read. Each index
+    is written by one side only (head by the producer, cursor and tail by the
+    consumer). The slot copy happens outside any lock; the producer then
+    publishes `(head, frames)` as one tuple under `changed`, so the consumer
+    never sees a slot before its copy has completed. Steps that read the other
+    side's index to decide what to overwrite or skip also run under `changed`.
+
+    Two publishing modes:
+    - try_publish(): lossless FIFO, refuses to publish while the ring is full.
+    - publish_latest(): never blocks, overwrites older unread frames; pair it
+      with pop_latest() for live sources.
+
+    Frames returned by pop()/pop_latest() stay owned by the consumer, and the
+    producer will not overwrite them, until the consumer calls release().
+
+    `changed` is a Condition notified on every publish and release, so either
+    side can block in changed.wait_for() instead of polling.
+    """
+
+    def __init__(self, size: int = 4):
+        if size < 4 or size & (size - 1):
+            raise ValueError(f"Ring size must be a power of two >= 4, got {size}")
+        self.size = size
+        self._mask = size - 1
+        self._head = 0  # producer's copy of the next sequence number to write
+        self._published = (0, None)  # (head, frames), replaced atomically by producer
+        self._cursor = 0  # next slot to read, written by consumer only
+        self._tail = 0  # first slot still owned by consumer, written by consumer only
+        self.changed = threading.Condition()
+
+    def _frames_for(self, frame):
+        """Slot list matching frame's shape/dtype, or None if a resize must wait"""
+        frames = self._published[1]
+        if frames is not None and frames[0].shape == frame.shape and frames[0].dtype == frame.dtype:
+            return frames
+        return [np.empty(frame.shape, dtype=frame.dtype) for _ in range(self.size)]
+
+    def _publish(self, seq, frames, frame):
+        np.copyto(frames[seq & self._mask], frame)
+        self._head = seq + 1
+        with self.changed:
+            self._published = (seq + 1, frames)  # publish only once the slot is fully written
+            self.changed.notify_all()
+
+    def has_space(self, frame) -> bool:
+        """True if try_publish(frame) would succeed"""
+        head = self._head
+        if head - self._tail >= self.size:
+            return False
+        frames = self._published[1]
+        if frames is not None and (frames[0].shape != frame.shape or frames[0].dtype != frame.dtype):
+            # A resize swaps in a new slot list; wait until every published
+            # frame has been read so no unread index points into the new list
+            return head == self._cursor
+        return True
+
+    def try_publish(self, frame) -> bool:
+        """Copy a frame into the next free slot; False if the ring is full (producer side)"""
+        if not self.has_space(frame):
+            return False
+        self._publish(self._head, self._frames_for(frame), frame)
+        return True
+
+    def publish_latest(self, frame):
+        """Copy a frame in, overwriting the oldest unread slot if needed (producer side)"""
+        frames = self._frames_for(frame)
+        seq = self._head
+        with self.changed:
+            # Never write the slot the consumer currently holds (last one popped)
+            cursor = self._cursor
+            if cursor and frames is self._published[1] and (seq & self._mask) == ((cursor - 1) & self._mask):
+                seq += 1
+        self._publish(seq, frames, frame)
+
+    def pop(self) -> Optional[np.ndarray]:
+        """Return the oldest unread frame, or None if nothing new (consumer side)"""
+        head, frames = self._published
+        cursor = self._cursor
+        if cursor == head:
+            return None
+        self._cursor = cursor + 1
+        return frames[cursor & self._mask]
+
+    def pop_latest(self) -> Optional[np.ndarray]:
+        """Return the newest unread frame, skipping older ones (consumer side)"""
+        with self.changed:
+            head, frames = self._published
+            if self._cursor == head:
+                return None
+            self._cursor = head
+        return frames[(head - 1) & self._mask]
+
+    def readable(self) -> bool:
+        """True if pop()/pop_latest() would return a frame"""
+        return self._cursor != self._published[0]
+
+    def release(self):
+        """Hand every frame read so far back to the producer (consumer side)"""
+        with self.changed:
+            self._tail = self._cursor
+            self.changed.notify_all()
+
+    def notify(self):
+        """Wake any waiter after an external state change (stop, end of stream)"""
+        with self.changed:
+            self.changed.notify_all()
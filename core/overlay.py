@@ -0,0 +1,37 @@
+"""
+Cached Text Overlay
+Renders HUD text into a small strip once and blits it onto each frame
+"""
+import cv2
+import numpy as np
+from typing import List, Tuple
+
+
+class TextOverlay:
+    """
+    Small BGR strip holding pre-rendered overlay text.
+
+    cv2.putText is only run when update() is called; blit() copies just the
+    glyph pixels into the top-left corner of the frame, so the background
+    stays visible as with drawing directly on the frame.
+    """
+
+    def __init__(self, height: int, width: int, font_scale: float = 0.7, thickness: int = 2):
+        self.strip = np.zeros((height, width, 3), np.uint8)
+        self.mask = np.zeros((height, width, 1), bool)
+        self.font_scale = font_scale
+        self.thickness = thickness
+
+    def update(self, lines: List[Tuple[str, Tuple[int, int], Tuple[int, int, int]]]):
+        """Redraw the strip from (text, origin, color) entries"""
+        self.strip.fill(0)
+        for text, org, color in lines:
+            cv2.putText(self.strip, text, org, cv2.FONT_HERSHEY_SIMPLEX,
+                        self.font_scale, color, self.thickness)
+        self.mask = self.strip.any(axis=2, keepdims=True)
+
+    def blit(self, frame):
+        """Copy the rendered text onto the frame in place"""
+        h = min(self.strip.shape[0], frame.shape[0])
+        w = min(self.strip.shape[1], frame.shape[1])
+        np.copyto(frame[:h, :w], self.strip[:h, :w], where=self.mask[:h, :w])
@@ -3,15 +3,18 @@ Unified Video Processing Service
 Handles video processing for both terminal and Streamlit interfaces
 """
 import cv2
+import numpy as np
 import time
 import threading
 from typing import List, Optional, Callable, Dict, Any
 from dataclasses import dataclass
 from core.events import Event
 from core.event_bus import bus
+from core.capture import ThreadedCapture
+from core.overlay import TextOverlay
+from core.frame_gate import StaticFrameGate
 from detectors.yolo_wrapper import BaseDetector
 from config import settings
-import queue
 import json
 
 @dataclass
@@ -37,11 +40,17 @@ class UnifiedVideoProcessor:
         self.frame_callback = None
         self.event_callback = None
         self.stop_event = threading.Event()
-        self.frame_queue = queue.Queue(maxsize=30)  # Buffer for frames
-        self.stats_lock = threading.Lock()
+        # Preview double buffer: producer fills the inactive slot, then swaps.
+        # _active is a plain int, so the swap is a single GIL-atomic store.
+        self._buf = [None, None]
+        self._active = 0
+        self._overlay = TextOverlay(75, 300, font_scale=0.7)
+        self._frame_gate = StaticFrameGate()
         
     def set_detectors(self, detectors: List[BaseDetector]):
-        """Update detectors dynamically"""
+        """Update detectors dynamically, re-snapshotting their config"""
+        for detector in detectors:
+            detector.configure()
         self.detectors = detectors
         
     def set_callbacks(self, frame_callback: Callable = None, event_callback: Callable = None):
@@ -49,23 +58,19 @@ class UnifiedVideoProcessor:
         self.frame_callback = frame_callback
         self.event_callback = event_callback
         
-    def set_frame_buffer(self, max_size: int = 30):
-        """Set frame buffer size for preview"""
-        self.frame_queue = queue.Queue(maxsize=max_size)
-        
     def load_video(self, source):
         """Load video source (file path or camera index)"""
         try:
             if isinstance(source, str):
                 self.video_source = source
-                self.cap = cv2.VideoCapture(source)
+                self.cap = ThreadedCapture(source)
                 if self.cap.isOpened():
                     self.status.total_frames = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
                     self.status.fps = self.cap.get(cv2.CAP_PROP_FPS) or 30.0
                     return True
             elif isinstance(source, int):
                 self.video_source = source
-                self.cap = cv2.VideoCapture(source)
+                self.cap = ThreadedCapture(source)
                 return self.cap.isOpened()
         except Exception as e:
             print(f"[ERROR] Failed to load video source {source}: {e}")
@@ -81,6 +86,9 @@ class UnifiedVideoProcessor:
         self.status.current_frame = 0
         self.status.events_detected = 0
         self.status.processing_time = time.time()
+        self._buf = [None, None]
+        self._active = 0
+        self._frame_gate.reset()
         
         self.processing_thread = threading.Thread(target=self._processing_loop, daemon=True)
         self.processing_thread.start()
@@ -100,6 +108,12 @@ class UnifiedVideoProcessor:
     def _processing_loop(self):
         """Main processing loop running in background thread"""
         start_time = time.time()
+        # Live cameras are paced by cap.read() blocking on the hardware clock;
+        # only file sources need to be throttled to their native frame rate.
+        pace_to_fps = isinstance(self.video_source, str)
+        pace_start = time.monotonic()
+        frames_paced = 0
+        overlay_events = None  # event count the overlay was last rendered with
         
         while not self.stop_event.is_set() and self.cap and self.cap.isOpened():
             ret, frame = self.cap.read()
@@ -107,55 +121,51 @@ class UnifiedVideoProcessor:
                 break
                 
             self.status.current_frame += 1
-            frame_start = time.time()
             
-            # Process frame through all detectors
+            # Process frame through all detectors. The frame is a decoder ring
+            # slot that the decoder thread will not touch until the next read(),
+            # so detectors and overlays draw on it in place.
+            # Static scenes skip the detectors; the preview keeps showing the
+            # last annotated frame and no events are re-emitted.
             events = []
-            processed_frame = frame.copy()
-            
-            for detector in self.detectors:
-                try:
-                    detector_events = detector.process(processed_frame, self.status.current_frame)
-                    events.extend(detector_events)
-                    
-                    # Publish events to bus
-                    for event in detector_events:
-                        bus.publish(event)
-                        
-                except Exception as e:
-                    print(f"[ERROR] Detector failed: {e}")
+            static = self._frame_gate.is_static(frame)
             
-            # Add frame info overlay
-            cv2.putText(processed_frame, f"Frame: {self.status.current_frame}", 
-                       (20, 30), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
+            if not static:
+                for detector in self.detectors:
+                    try:
+                        detector_events = detector.process(frame, self.status.current_frame)
+                        events.extend(detector_events)
+                    except Exception as e:
+                        print(f"[ERROR] Detector failed: {e}")
             
-            # Add event count overlay
+            # Publish this frame's events to bus in one batch
             if events:
-                cv2.putText(processed_frame, f"Events: {len(events)}", 
-                           (20, 60), cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 255), 2)
+                bus.publish_batch(events)
             
-            # Update statistics
-            with self.stats_lock:
-                self.status.events_detected += len(events)
-                self.status.last_update = time.time()
+            # Add frame info / event count overlay. Text is re-rendered every
+            # 5 frames or when the event count changes, otherwise just blitted.
+            if self.status.current_frame % 5 == 0 or len(events) != overlay_events:
+                overlay_events = len(events)
+                lines = [(f"Frame: {self.status.current_frame}", (20, 30), (0, 255, 0))]
+                if events:
+                    lines.append((f"Events: {len(events)}", (20, 60), (0, 255, 255)))
+                self._overlay.update(lines)
+            self._overlay.blit(frame)
+            
+            # Update statistics (this thread is the only writer)
+            self.status.events_detected += len(events)
+            self.status.last_update = time.time()
             
             # Send frame via callback (for Streamlit)
             if self.frame_callback:
                 try:
-                    self.frame_callback(processed_frame, events)
+                    self.frame_callback(frame, events)
                 except Exception as e:
                     print(f"[ERROR] Frame callback failed: {e}")
             
-            # Store frame in queue for Streamlit preview
-            try:
-                # Clear old frames if queue is full
-                while self.frame_queue.qsize() >= self.frame_queue.maxsize:
-                    self.frame_queue.get_nowait()
-                self.frame_queue.put(processed_frame, timeout=0.01)
-            except queue.Full:
-                pass  # Skip frame if queue is full
-            except Exception as e:
-                print(f"[ERROR] Frame queue error: {e}")
+            # Publish frame for Streamlit preview via double-buffer swap
+            if not static:
+                self._publish_preview(frame)
             
             # Send events via callback
             if self.event_callback and events:
@@ -164,35 +174,51 @@ class UnifiedVideoProcessor:
                 except Exception as e:
                     print(f"[ERROR] Event callback failed: {e}")
             
-            # Control frame rate for real-time processing
-            processing_time = time.time() - frame_start
-            target_delay = 1.0 / self.status.fps
-            if processing_time < target_delay:
-                time.sleep(target_delay - processing_time)
+            # Control frame rate against a monotonic deadline so sleep jitter
+            # does not accumulate as drift
+            if pace_to_fps:
+                frames_paced += 1
+                next_deadline = pace_start + frames_paced / self.status.fps
+                now = time.monotonic()
+                slack = next_deadline - now
+                if slack < -1.0 / self.status.fps:
+                    # More than a frame behind (e.g. model warm-up): re-anchor
+                    # instead of playing frames back-to-back to catch up
+                    pace_start = now
+                    frames_paced = 0
+                # Wait on stop_event rather than sleeping so stop_processing()
+                # wakes the loop immediately
+                if slack > 0.002 and self.stop_event.wait(slack):
+                    break
         
         # Processing completed
         self.status.is_processing = False
         self.status.processing_time = time.time() - start_time
         
+    def _publish_preview(self, frame):
+        """Copy frame into the inactive preview buffer and make it active"""
+        idx = 1 - self._active
+        buf = self._buf[idx]
+        if buf is None or buf.shape != frame.shape:
+            buf = self._buf[idx] = np.empty_like(frame)
+        np.copyto(buf, frame)
+        self._active = idx
+        
     def get_status(self) -> ProcessingStatus:
         """Get current processing status"""
-        with self.stats_lock:
-            return ProcessingStatus(
-                is_processing=self.status.is_processing,
-                current_frame=self.status.current_frame,
-                total_frames=self.status.total_frames,
-                fps=self.status.fps,
-                events_detected=self.status.events_detected,
-                processing_time=self.status.processing_time,
-                last_update=self.status.last_update
-            )
+        return ProcessingStatus(
+            is_processing=self.status.is_processing,
+            current_frame=self.status.current_frame,
+            total_frames=self.status.total_frames,
+            fps=self.status.fps,
+            events_detected=self.status.events_detected,
+            processing_time=self.status.processing_time,
+            last_update=self.status.last_update
+        )
     
     def get_frame(self) -> Optional[Any]:
         """Get latest processed frame (non-blocking)"""
-        try:
-            return self.frame_queue.get_nowait()
-        except queue.Empty:
-            return None
+        return self._buf[self._active]
 
 # Global processor instance
 _processor_instance = None
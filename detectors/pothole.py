@@ -15,8 +15,13 @@ class PotholeDetector(BaseDetector):
         # Let's write generic logic assuming class name contains 'pothole' or we use a proxy.
         self.pothole_keywords = ['pothole', 'hole', 'bowl'] # 'bowl' is a proxy for demo w/ stock model
 
+    def configure(self):
+        super().configure()
+        self.min_area = settings.POTHOLE_MIN_AREA
+
     def process(self, frame, frame_id: int) -> List[Event]:
         events = []
+        min_area = self.min_area
         results = self.model(frame, verbose=False) # Run on all classes
         
         if not results:
@@ -32,9 +37,9 @@ class PotholeDetector(BaseDetector):
                 
                 # Severity Logic
                 severity = "LOW"
-                if area > settings.POTHOLE_MIN_AREA * 2:
+                if area > min_area * 2:
                     severity = "HIGH"
-                elif area > settings.POTHOLE_MIN_AREA:
+                elif area > min_area:
                     severity = "MEDIUM"
                 
                 events.append(Event(
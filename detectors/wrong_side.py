@@ -3,6 +3,7 @@ from detectors.yolo_wrapper import BaseDetector
 from core.events import Event
 from config import settings
 from typing import List
+import bisect
 import math
 
 class WrongSideDetector(BaseDetector):
@@ -14,8 +15,22 @@ class WrongSideDetector(BaseDetector):
         # Violations state: {track_id: {"frames": int, "last_alert": float}}
         self.violation_state: Dict[int, Dict] = {}
 
+    def configure(self):
+        super().configure()
+        # Sorted tuple so the lane index is a bisect instead of a Python loop
+        self.lane_boundaries = tuple(sorted(settings.LANE_BOUNDARIES))
+        self.cooldown = settings.WRONG_SIDE_COOLDOWN
+        self.min_frames = settings.WRONG_SIDE_MIN_FRAMES
+        self.violation_confidence = settings.WRONG_SIDE_CONFIDENCE
+        self.smoothing_frames = settings.DIRECTION_SMOOTHING_FRAMES
+
     def process(self, frame, frame_id: int) -> List[Event]:
         events = []
+        lane_boundaries = self.lane_boundaries
+        cooldown = self.cooldown
+        min_frames = self.min_frames
+        violation_confidence = self.violation_confidence
+        smoothing_frames = self.smoothing_frames
         height, width = frame.shape[:2]
         mid_x = width // 2
         
@@ -54,7 +69,7 @@ class WrongSideDetector(BaseDetector):
             if track_id not in self.history:
                 self.history[track_id] = []
             self.history[track_id].append((center_x, center_y))
-            if len(self.history[track_id]) > settings.DIRECTION_SMOOTHING_FRAMES:
+            if len(self.history[track_id]) > smoothing_frames:
                 self.history[track_id].pop(0)
 
             # Need history to calculate vector
@@ -90,15 +105,9 @@ class WrongSideDetector(BaseDetector):
                 lane_status = "Unknown"
                 
                 # Determine lane index using configurable boundaries
-                lane_idx = None
-                if settings.LANE_BOUNDARIES:
-                    # Find first boundary greater than center_x
-                    for i, bound in enumerate(settings.LANE_BOUNDARIES):
-                        if center_x < bound:
-                            lane_idx = i
-                            break
-                    if lane_idx is None:
-                        lane_idx = len(settings.LANE_BOUNDARIES)
+                if lane_boundaries:
+                    # Index of first boundary greater than center_x
+                    lane_idx = bisect.bisect_right(lane_boundaries, center_x)
                 else:
                     # Fallback to simple two‑lane split
                     lane_idx = 0 if center_x < mid_x else 1
@@ -118,7 +127,7 @@ class WrongSideDetector(BaseDetector):
                 if track_id not in self.violation_state:
                     self.violation_state[track_id] = {"frames": 0, "last_alert": 0}
 
-                if is_wrong_side and conf > settings.WRONG_SIDE_CONFIDENCE:
+                if is_wrong_side and conf > violation_confidence:
                     self.violation_state[track_id]["frames"] += 1
                 else:
                     self.violation_state[track_id]["frames"] = 0
@@ -126,8 +135,8 @@ class WrongSideDetector(BaseDetector):
                 state_frames = self.violation_state[track_id]["frames"]
                 
                 # Check for Violation Trigger
-                if state_frames >= settings.WRONG_SIDE_MIN_FRAMES:
-                    if (current_time - self.violation_state[track_id]["last_alert"]) > settings.WRONG_SIDE_COOLDOWN:
+                if state_frames >= min_frames:
+                    if (current_time - self.violation_state[track_id]["last_alert"]) > cooldown:
                         is_confirmed_violation = True
                         self.violation_state[track_id]["last_alert"] = current_time
 
@@ -1,19 +1,176 @@
+import os
+import time
 import cv2
 import numpy as np
 from ultralytics import YOLO
 from typing import List, Dict, Any
 from config import settings
 
+try:
+    import torch
+    CUDA_AVAILABLE = torch.cuda.is_available()
+except ImportError:
+    CUDA_AVAILABLE = False
+
+
+def resolve_model_path(model_path=settings.YOLO_MODEL_PATH) -> str:
+    """Path load_yolo will actually load: the exported engine if usable, else model_path"""
+    if CUDA_AVAILABLE:
+        engine_path = os.path.splitext(model_path)[0] + ".engine"
+        if os.path.exists(engine_path):
+            return engine_path
+    return model_path
+
+
+def load_yolo(model_path=settings.YOLO_MODEL_PATH):
+    """
+    Load a YOLO model, running it in FP16 on the GPU when CUDA is available.
+    A TensorRT engine exported next to the weights (see export_engine) is
+    preferred over the .pt file.
+    """
+    model_path = resolve_model_path(model_path)
+    print(f"[SYSTEM] Loading YOLO model from {model_path}...")
+    model = YOLO(model_path)
+    if CUDA_AVAILABLE:
+        # Overrides apply to every predict()/track() call on this model
+        model.overrides.update(device=0, half=settings.YOLO_HALF_PRECISION)
+    return model
+
+
+def export_engine(model_path=settings.YOLO_MODEL_PATH, batch=settings.YOLO_BATCH_SIZE):
+    """
+    One-off export of an FP16 TensorRT engine for the current GPU.
+    The engine is built with a dynamic batch dimension up to `batch` so the
+    batched video path (YOLO_BATCH_SIZE frames per call) can run on it.
+    Run from the project root: python -m detectors.yolo_wrapper --export-engine
+    """
+    return YOLO(model_path).export(format="engine", half=True, dynamic=True, batch=batch)
+
+
+class PinnedInputPipeline:
+    """
+    Letterboxes frames into one CUDA pinned host buffer and uploads it as
+    uint8, converting to float on the GPU. The model is fed the GPU tensor
+    directly and the resulting boxes are mapped back to the original frame.
+
+    The only saving is the pageable-to-pinned staging copy the driver makes
+    for an ordinary host tensor; the upload is not overlapped with anything,
+    since each frame's inference finishes before the next frame is read.
+
+    `square=True` pads to imgsz x imgsz, as ultralytics does for exported
+    engines; otherwise the padded size is the scaled frame rounded up to the
+    stride, as ultralytics does for .pt models (e.g. 640x480 for 4:3).
+
+    Only usable when CUDA is available, and only worth enabling where
+    `python -m detectors.yolo_wrapper --benchmark-input SOURCE` shows it beats
+    plain model(frame): ultralytics still copies the input tensor back to the
+    host in postprocess.
+    """
+
+    STRIDE = 32
+
+    def __init__(self, imgsz: int = settings.YOLO_IMGSZ, half: bool = settings.YOLO_HALF_PRECISION,
+                 square: bool = True):
+        self.imgsz = imgsz
+        self.half = half
+        self.square = square
+        # Flat uint8 buffer sized for the largest (square) input; each frame
+        # uses a contiguous HWC view of the front. uint8 keeps the H2D copy at
+        # 1 byte/pixel; the float conversion happens on the GPU
+        self._pinned = torch.empty(imgsz * imgsz * 3, dtype=torch.uint8).pin_memory()
+
+    def upload(self, frame):
+        """Letterbox frame into the pinned buffer and upload it to the GPU"""
+        h, w = frame.shape[:2]
+        r = min(self.imgsz / h, self.imgsz / w)
+        nh, nw = round(h * r), round(w * r)
+        if self.square:
+            out_h = out_w = self.imgsz
+        else:
+            out_h = -(-nh // self.STRIDE) * self.STRIDE
+            out_w = -(-nw // self.STRIDE) * self.STRIDE
+        top, left = (out_h - nh) // 2, (out_w - nw) // 2
+
+        pinned = self._pinned[:out_h * out_w * 3].view(out_h, out_w, 3)
+        buf = pinned.numpy()
+        buf.fill(114)
+        buf[top:top + nh, left:left + nw] = cv2.resize(frame, (nw, nh), interpolation=cv2.INTER_LINEAR)
+
+        # Blocking copy: the buffer is rewritten on the next call
+        gpu = pinned.to("cuda")
+        # HWC BGR uint8 -> 1x3xHxW RGB in [0, 1]
+        gpu = gpu.permute(2, 0, 1)[[2, 1, 0]].unsqueeze(0)
+        gpu = (gpu.half() if self.half else gpu.float()) / 255.0
+        return gpu, r, left, top
+
+    def predict(self, model, frame):
+        """Run model on frame via the pinned upload path; returns ultralytics results"""
+        gpu, r, left, top = self.upload(frame)
+        results = model.predict(gpu, verbose=False)
+        res = results[0]
+        res.orig_img = frame
+        res.orig_shape = frame.shape[:2]
+        data = res.boxes.data.clone()
+        data[:, [0, 2]] = (data[:, [0, 2]] - left) / r
+        data[:, [1, 3]] = (data[:, [1, 3]] - top) / r
+        res.update(boxes=data)
+        return results
+
+
+def benchmark_input(source, frames: int = 200, model_path=settings.YOLO_MODEL_PATH):
+    """
+    Time plain model(frame) against PinnedInputPipeline on frames from source
+    and print ms/frame for each, to decide on settings.YOLO_PINNED_INPUT.
+    """
+    cap = cv2.VideoCapture(int(source) if str(source).isdigit() else source)
+    samples = []
+    while len(samples) < frames:
+        ret, frame = cap.read()
+        if not ret:
+            break
+        samples.append(frame)
+    cap.release()
+    if not samples:
+        print(f"[ERROR] Could not read frames from {source}")
+        return
+
+    resolved = resolve_model_path(model_path)
+    model = load_yolo(model_path)
+    pipeline = PinnedInputPipeline(square=resolved.endswith(".engine"))
+    runs = {
+        "model(frame)": lambda f: model(f, verbose=False),
+        "pinned input": lambda f: pipeline.predict(model, f),
+    }
+    for name, run in runs.items():
+        for frame in samples[:10]:  # warm-up
+            run(frame)
+        torch.cuda.synchronize()
+        start = time.perf_counter()
+        for frame in samples:
+            run(frame)
+        torch.cuda.synchronize()
+        print(f"[BENCH] {name}: {(time.perf_counter() - start) * 1000 / len(samples):.2f} ms/frame "
+              f"({len(samples)} frames, {resolved})")
+
+
 class BaseDetector:
     def __init__(self, model_path=settings.YOLO_MODEL_PATH):
-        print(f"[SYSTEM] Loading YOLO model from {model_path}...")
-        self.model = YOLO(model_path)
+        self.model = load_yolo(model_path)
+        self.configure()
+    
+    def configure(self):
+        """
+        Snapshot config values into instance attributes so the per-frame code
+        reads locals/attributes instead of module globals. Called on
+        construction and again whenever the processor installs the detector.
+        """
+        self.confidence_threshold = settings.CONFIDENCE_THRESHOLD
     
     def detect(self, frame):
         """
         Raw YOLO detection
         """
-        results = self.model(frame, verbose=False, conf=settings.CONFIDENCE_THRESHOLD)
+        results = self.model(frame, verbose=False, conf=self.confidence_threshold)
         return results[0]  # Return first result (single image/frame)
 
     def process(self, frame, frame_id: int):
@@ -22,3 +179,24 @@ class BaseDetector:
         Should return a list of Event objects or triggering side effects.
         """
         raise NotImplementedError
+
+
+if __name__ == "__main__":
+    import argparse
+    parser = argparse.ArgumentParser(description="CAMVIEW.AI YOLO model utilities")
+    parser.add_argument("--export-engine", action="store_true",
+                        help="Export an FP16 TensorRT engine next to the weights (requires CUDA)")
+    parser.add_argument("--benchmark-input", type=str, metavar="SOURCE",
+                        help="Compare plain inference with the pinned-memory input path (requires CUDA)")
+    parser.add_argument("--frames", type=int, default=200, help="Frames to benchmark")
+    parser.add_argument("--model", type=str, default=settings.YOLO_MODEL_PATH, help="Weights to export/benchmark")
+    args = parser.parse_args()
+
+    if (args.export_engine or args.benchmark_input) and not CUDA_AVAILABLE:
+        print("[ERROR] This command requires a CUDA GPU")
+    elif args.export_engine:
+        print(f"[SYSTEM] Engine written to {export_engine(args.model)}")
+    elif args.benchmark_input:
+        benchmark_input(args.benchmark_input, args.frames, args.model)
+    else:
+        parser.print_help()
@@ -1,7 +1,7 @@
-import json
 import os
 import logging
-from core.events import Event
+from typing import Any, Dict, List
+from core.events import Event, dumps_json_lines
 from core.event_bus import bus
 from config import settings
 from core import firebase_client
@@ -29,8 +29,8 @@ class EventLogger:
         # Restore original path
         settings.FIREBASE_CREDENTIALS = original_firebase_path
         
-        # Subscribe to all events
-        bus.subscribe("*", self.handle_event)
+        # Subscribe to all events (delivered once per published batch)
+        bus.subscribe_batch(self.handle_events)
         print(f"[SYSTEM] Logger initialized. Writing to {self.log_file}")
         if os.path.exists(firebase_path):
             print(f"[SYSTEM] Firebase configured: {firebase_path}")
@@ -41,14 +41,23 @@ class EventLogger:
         """
         Log event to console, file, and Firebase
         """
+        self.handle_events([event])
+
+    def handle_events(self, events: List[Event]):
+        """
+        Log a batch of events to console, file, and Firebase
+        """
         # 1. Console Output (Terminal)
-        self._print_terminal(event)
+        for event in events:
+            self._print_terminal(event)
+        
+        event_dicts = [event.to_dict() for event in events]
         
-        # 2. File Output (JSONL)
-        self._write_file(event)
+        # 2. File Output (JSONL) - one open/write for the whole batch
+        self._write_file(event_dicts)
         
-        # 3. Firebase Output (Firestore)
-        self._write_firebase(event)
+        # 3. Firebase Output (Firestore) - queued, written in the background
+        self._write_firebase(event_dicts)
 
     def _print_terminal(self, event: Event):
         if event.severity == "CRITICAL":
@@ -60,17 +69,17 @@ class EventLogger:
             
         print(f"{prefix} {event.event_type} @ {event.time_str} | Camera: {event.camera_id} | {event.metadata}")
 
-    def _write_file(self, event: Event):
+    def _write_file(self, event_dicts: List[Dict[str, Any]]):
         try:
-            with open(self.log_file, "a") as f:
-                f.write(json.dumps(event.to_dict()) + "\n")
+            with open(self.log_file, "ab") as f:
+                f.write(dumps_json_lines(event_dicts))
         except Exception as e:
             logging.error(f"Failed to write to log file: {e}")
     
-    def _write_firebase(self, event: Event):
-        """Write event to Firebase Firestore"""
+    def _write_firebase(self, event_dicts: List[Dict[str, Any]]):
+        """Queue events for Firebase Firestore"""
         try:
-            firebase_client.save_event(event.to_dict())
+            firebase_client.save_events(event_dicts)
         except Exception as e:
             logging.debug(f"Firebase write skipped: {e}")
 
@@ -1,24 +1,119 @@
 import cv2
 import time
 import threading
-import json
 import os
+from collections import deque
 from datetime import datetime
-from ultralytics import YOLO
 import numpy as np
+from ultralytics.utils.plotting import Annotator, colors
+from core.capture import ThreadedCapture
+from core.events import format_timestamp, dumps_json_lines
+from core.frame_gate import StaticFrameGate
+from core.overlay import TextOverlay
+from config import settings
+from detectors.yolo_wrapper import load_yolo, resolve_model_path, PinnedInputPipeline, CUDA_AVAILABLE
+
+try:
+    from numba import njit
+    NUMBA_AVAILABLE = True
+except ImportError:
+    NUMBA_AVAILABLE = False
+
+# Frames per YOLO call for video files (webcam stays at 1 to keep latency low)
+VIDEO_BATCH_SIZE = settings.YOLO_BATCH_SIZE
+
+KEY_QUIT = ord('q')
+KEY_SCREENSHOT = ord('s')
+
+EVENTS_LOG_MAXLEN = 10_000  # Recent events kept in memory (all are streamed to disk)
+
+# Map YOLO (COCO) classes to traffic safety events
+TRAFFIC_EVENTS = {
+    0: 'person',      # pedestrian
+    1: 'bicycle',     # bicycle
+    2: 'car',         # car
+    3: 'motorcycle',  # motorcycle
+    5: 'bus',         # bus
+    7: 'truck',       # truck
+}
+
+# Severity based on object type: vulnerable road users are critical
+SEVERITY_BY_CLASS = {
+    0: 'CRITICAL',
+    1: 'CRITICAL',
+    2: 'INFO',
+    3: 'WARNING',
+    5: 'INFO',
+    7: 'INFO',
+}
+
+# Array form of SEVERITY_BY_CLASS for the box filter: class id -> severity
+# code (index into SEVERITY_NAMES), -1 for classes that are not logged
+SEVERITY_NAMES = ('INFO', 'WARNING', 'CRITICAL')
+SEVERITY_CODE_BY_CLASS = np.full(max(SEVERITY_BY_CLASS) + 1, -1, dtype=np.int8)
+for _cls, _severity in SEVERITY_BY_CLASS.items():
+    SEVERITY_CODE_BY_CLASS[_cls] = SEVERITY_NAMES.index(_severity)
+
+if NUMBA_AVAILABLE:
+    @njit(cache=True)
+    def filter_boxes(conf, cls, thr, severity_lut):
+        """Indices and severity codes of boxes above thr with a logged class"""
+        keep = np.empty(conf.size, np.int64)
+        sev = np.empty(conf.size, np.int8)
+        n = 0
+        for i in range(conf.size):
+            if conf[i] <= thr:
+                continue
+            c = cls[i]
+            if c < 0 or c >= severity_lut.size:
+                continue
+            s = severity_lut[c]
+            if s < 0:
+                continue
+            keep[n] = i
+            sev[n] = s
+            n += 1
+        return keep[:n], sev[:n]
+else:
+    def filter_boxes(conf, cls, thr, severity_lut):
+        """Indices and severity codes of boxes above thr with a logged class"""
+        in_range = (cls >= 0) & (cls < severity_lut.size)
+        sev = np.full(cls.size, -1, dtype=np.int8)
+        sev[in_range] = severity_lut[cls[in_range]]
+        keep = np.nonzero((conf > thr) & (sev >= 0))[0]
+        return keep, sev[keep]
+
+def box_arrays(result):
+    """(confs, classes, xyxys) host arrays for a Results, in one device-to-host copy"""
+    data = result.boxes.data.cpu().numpy()  # rows: x1, y1, x2, y2, [track id,] conf, cls
+    return data[:, -2], data[:, -1].astype(np.int32), data[:, :4]
 
 class RealTimeYOLODetector:
     def __init__(self):
-        self.model = YOLO('yolo11n.pt')
+        self.model = load_yolo('yolo11n.pt')
         self.cap = None
         self.running = False
-        self.events_log = []
+        self.events_log = deque(maxlen=EVENTS_LOG_MAXLEN)
+        self.total_events = 0
         self.frame_count = 0
         self.start_time = time.time()
+        self._log_fh = None
+        self._open_event_log()
+        self._overlay = TextOverlay(120, 420, font_scale=1)
+        self._frame_gate = StaticFrameGate()
+        self._last_results = None
+        self._last_boxes = None
+        # Pinned-memory async upload path for the latency-bound webcam loop
+        # (engines only, whose input is a full square either way; opt-in via
+        # settings.YOLO_PINNED_INPUT once benchmarked)
+        use_pinned = (CUDA_AVAILABLE and settings.YOLO_PINNED_INPUT
+                      and resolve_model_path('yolo11n.pt').endswith('.engine'))
+        self._gpu_input = PinnedInputPipeline(square=True) if use_pinned else None
         
     def start_webcam_detection(self):
         """Start real-time YOLO detection on webcam in separate window"""
-        self.cap = cv2.VideoCapture(0)
+        self.cap = ThreadedCapture(0)
+        self._frame_gate.reset()
         if not self.cap.isOpened():
             print("Error: Could not open webcam")
             return
@@ -27,6 +122,15 @@ class RealTimeYOLODetector:
         print("🔴 Real-time YOLO Detection Started")
         print("Press 'q' to quit, 's' to save screenshot")
         
+        # Bind hot-loop callables to locals once (LOAD_FAST instead of global/attr lookups)
+        _time = time.time
+        _imshow = cv2.imshow
+        _waitKey = cv2.waitKey
+        draw_detections = self.draw_detections
+        log_traffic_events = self.log_traffic_events
+        _box_arrays = box_arrays
+        overlay = self._overlay
+        
         while self.running:
             ret, frame = self.cap.read()
             if not ret:
@@ -35,35 +139,48 @@ class RealTimeYOLODetector:
                 
             self.frame_count += 1
             
-            # Run YOLO detection
-            results = self.model(frame, verbose=False)
+            # Run YOLO detection, reusing the previous results on a static scene
+            reuse = self._frame_gate.is_static(frame)
+            if reuse:
+                results = self._last_results
+                boxes = self._last_boxes
+            else:
+                if self._gpu_input is not None:
+                    results = self._gpu_input.predict(self.model, frame)
+                else:
+                    results = self.model(frame, verbose=False)
+                boxes = _box_arrays(results[0])
+                self._last_results = results
+                self._last_boxes = boxes
             
             # Process detections
-            current_time = time.time()
+            current_time = _time()
             fps = self.frame_count / (current_time - self.start_time)
             
-            # Draw detections on frame
-            annotated_frame = results[0].plot()
+            # Draw detections on frame (in place)
+            annotated_frame = draw_detections(frame, results[0].names, boxes)
             
-            # Add info overlay
-            cv2.putText(annotated_frame, f"FPS: {fps:.1f}", (10, 30), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-            cv2.putText(annotated_frame, f"Frame: {self.frame_count}", (10, 70), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-            cv2.putText(annotated_frame, f"Detections: {len(results[0].boxes)}", (10, 110), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
+            # Add info overlay (text re-rendered every 5 frames, blitted otherwise)
+            if self.frame_count % 5 == 1:
+                overlay.update([
+                    (f"FPS: {fps:.1f}", (10, 30), (0, 255, 0)),
+                    (f"Frame: {self.frame_count}", (10, 70), (0, 255, 0)),
+                    (f"Detections: {len(boxes[0])}", (10, 110), (0, 255, 0)),
+                ])
+            overlay.blit(annotated_frame)
             
-            # Log events for traffic safety
-            self.log_traffic_events(results[0], current_time)
+            # Log events for traffic safety (reused results were already logged)
+            if not reuse:
+                log_traffic_events(boxes, current_time)
             
             # Display frame
-            cv2.imshow('🔴 Real-Time YOLO Traffic Detection', annotated_frame)
+            _imshow('🔴 Real-Time YOLO Traffic Detection', annotated_frame)
             
             # Handle key presses
-            key = cv2.waitKey(1) & 0xFF
-            if key == ord('q'):
+            key = _waitKey(1) & 0xFF
+            if key == KEY_QUIT:
                 break
-            elif key == ord('s'):
+            elif key == KEY_SCREENSHOT:
                 # Save screenshot
                 timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
                 cv2.imwrite(f"detection_screenshot_{timestamp}.jpg", annotated_frame)
@@ -73,7 +190,8 @@ class RealTimeYOLODetector:
     
     def start_video_detection(self, video_path):
         """Start YOLO detection on video file"""
-        self.cap = cv2.VideoCapture(video_path)
+        # Ring holds two batches so decoding the next batch overlaps inference
+        self.cap = ThreadedCapture(video_path, ring_size=2 * VIDEO_BATCH_SIZE)
         if not self.cap.isOpened():
             print(f"Error: Could not open video file: {video_path}")
             return
@@ -86,104 +204,127 @@ class RealTimeYOLODetector:
         total_frames = int(self.cap.get(cv2.CAP_PROP_FRAME_COUNT))
         fps = self.cap.get(cv2.CAP_PROP_FPS)
         
-        while self.running:
-            ret, frame = self.cap.read()
-            if not ret:
-                print("Video processing completed")
+        # Bind hot-loop callables to locals once (LOAD_FAST instead of global/attr lookups)
+        _time = time.time
+        _imshow = cv2.imshow
+        _waitKey = cv2.waitKey
+        draw_detections = self.draw_detections
+        log_traffic_events = self.log_traffic_events
+        _box_arrays = box_arrays
+        overlay = self._overlay
+        
+        video_done = False
+        while self.running and not video_done:
+            # Read up to VIDEO_BATCH_SIZE frames and run them through YOLO in one call
+            batch = self.cap.read_batch(VIDEO_BATCH_SIZE)
+            if len(batch) < VIDEO_BATCH_SIZE:
+                video_done = True
+            if not batch:
                 break
-                
-            self.frame_count += 1
-            
-            # Run YOLO detection
-            results = self.model(frame, verbose=False)
-            
-            # Draw detections on frame
-            annotated_frame = results[0].plot()
-            
-            # Add info overlay
-            progress = (self.frame_count / total_frames) * 100
-            cv2.putText(annotated_frame, f"Frame: {self.frame_count}/{total_frames}", (10, 30), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-            cv2.putText(annotated_frame, f"Progress: {progress:.1f}%", (10, 70), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-            cv2.putText(annotated_frame, f"Detections: {len(results[0].boxes)}", (10, 110), 
-                       cv2.FONT_HERSHEY_SIMPLEX, 1, (0, 255, 0), 2)
-            
-            # Log events for traffic safety
-            self.log_traffic_events(results[0], time.time())
             
-            # Display frame
-            cv2.imshow('🎬 YOLO Video Detection', annotated_frame)
+            # Run YOLO detection on the whole batch (ultralytics accepts a list)
+            results_list = self.model(batch, verbose=False)
             
-            # Handle key presses
-            key = cv2.waitKey(1) & 0xFF
-            if key == ord('q'):
-                break
-            elif key == ord('s'):
-                # Save screenshot
-                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-                cv2.imwrite(f"video_detection_screenshot_{timestamp}.jpg", annotated_frame)
-                print(f"📸 Screenshot saved: video_detection_screenshot_{timestamp}.jpg")
+            for frame, result in zip(batch, results_list):
+                self.frame_count += 1
+                boxes = _box_arrays(result)
+                
+                # Draw detections on frame (in place)
+                annotated_frame = draw_detections(frame, result.names, boxes)
+                
+                # Add info overlay (text re-rendered every 5 frames, blitted otherwise)
+                if self.frame_count % 5 == 1:
+                    progress = (self.frame_count / total_frames) * 100
+                    overlay.update([
+                        (f"Frame: {self.frame_count}/{total_frames}", (10, 30), (0, 255, 0)),
+                        (f"Progress: {progress:.1f}%", (10, 70), (0, 255, 0)),
+                        (f"Detections: {len(boxes[0])}", (10, 110), (0, 255, 0)),
+                    ])
+                overlay.blit(annotated_frame)
+                
+                # Log events for traffic safety
+                log_traffic_events(boxes, _time())
+                
+                # Display frame
+                _imshow('🎬 YOLO Video Detection', annotated_frame)
+                
+                # Handle key presses
+                key = _waitKey(1) & 0xFF
+                if key == KEY_QUIT:
+                    self.running = False
+                    break
+                elif key == KEY_SCREENSHOT:
+                    # Save screenshot
+                    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                    cv2.imwrite(f"video_detection_screenshot_{timestamp}.jpg", annotated_frame)
+                    print(f"📸 Screenshot saved: video_detection_screenshot_{timestamp}.jpg")
+        
+        if video_done and self.running:
+            print("Video processing completed")
         
         self.stop_detection()
     
-    def log_traffic_events(self, results, current_time):
-        """Log traffic safety events"""
+    def draw_detections(self, frame, names, boxes):
+        """Draw box_arrays() boxes directly onto frame (Results.plot() copies the whole image)"""
+        confs, classes, xyxys = boxes
+        if len(confs) == 0:
+            return frame
+        
+        annotator = Annotator(frame, example=str(names))
+        for xyxy, conf, cls in zip(xyxys, confs, classes):
+            annotator.box_label(xyxy, f"{names[cls]} {conf:.2f}", color=colors(cls, True))
+        return annotator.result()
+    
+    def log_traffic_events(self, boxes, current_time):
+        """Log traffic safety events from box_arrays() boxes"""
         detections = []
+        confs, classes, xyxys = boxes
+        if len(confs) == 0:
+            return
         
-        for box in results.boxes:
-            if box.conf > 0.5:  # Confidence threshold
-                cls = int(box.cls)
-                conf = float(box.conf)
-                
-                # Map YOLO classes to traffic safety events
-                traffic_events = {
-                    0: 'person',      # pedestrian
-                    1: 'bicycle',     # bicycle
-                    2: 'car',         # car
-                    3: 'motorcycle',  # motorcycle
-                    5: 'bus',         # bus
-                    7: 'truck',       # truck
-                }
-                
-                if cls in traffic_events:
-                    event_type = traffic_events[cls]
-                    
-                    # Determine severity based on object type and confidence
-                    if event_type in ['person', 'bicycle']:
-                        severity = 'CRITICAL'
-                    elif event_type in ['motorcycle']:
-                        severity = 'WARNING'
-                    else:
-                        severity = 'INFO'
-                    
-                    detection = {
-                        'time': current_time,
-                        'time_fmt': datetime.fromtimestamp(current_time).strftime('%Y-%m-%d %H:%M:%S'),
-                        'type': event_type,
-                        'confidence': conf,
-                        'severity': severity,
-                        'camera': 'CAM_01',
-                        'frame_id': self.frame_count,
-                        'bbox': box.xyxy[0].tolist() if box.xyxy is not None else []
-                    }
-                    detections.append(detection)
+        # Confidence threshold + traffic-relevant classes only
+        keep, severities = filter_boxes(confs, classes, 0.5, SEVERITY_CODE_BY_CLASS)
+        time_fmt = format_timestamp(current_time)
+        
+        for i, severity in zip(keep.tolist(), severities.tolist()):
+            detection = {
+                'time': current_time,
+                'time_fmt': time_fmt,
+                'type': TRAFFIC_EVENTS[int(classes[i])],
+                'confidence': float(confs[i]),
+                'severity': SEVERITY_NAMES[severity],
+                'camera': 'CAM_01',
+                'frame_id': self.frame_count,
+                'bbox': xyxys[i].tolist()
+            }
+            detections.append(detection)
         
         # Add to events log
         self.events_log.extend(detections)
+        self.total_events += len(detections)
         
-        # Save to file periodically
-        if len(self.events_log) % 10 == 0:
-            self.save_events()
+        # Stream new events straight to the open log file
+        if detections:
+            self.save_events(detections)
+    
+    def _open_event_log(self):
+        """Open the JSONL event log once, unbuffered binary, for the detector's lifetime"""
+        try:
+            os.makedirs(os.path.dirname(settings.USER_EVENT_LOG_FILE), exist_ok=True)
+            # Unbuffered: each save_events() call is a single write() of whole lines
+            self._log_fh = open(settings.USER_EVENT_LOG_FILE, 'ab', buffering=0)
+        except Exception as e:
+            print(f"Error opening event log: {e}")
+            self._log_fh = None
     
-    def save_events(self):
-        """Save events to JSON file"""
+    def save_events(self, events):
+        """Append events to the JSONL log file"""
+        if self._log_fh is None:
+            self._open_event_log()
+            if self._log_fh is None:
+                return
         try:
-            os.makedirs('data/logs', exist_ok=True)
-            with open('data/logs/events.jsonl', 'a') as f:
-                for event in self.events_log[-10:]:  # Save last 10 events
-                    f.write(json.dumps(event) + '\n')
-            print(f"💾 Saved {len(self.events_log[-10:])} events to log")
+            self._log_fh.write(dumps_json_lines(events))
         except Exception as e:
             print(f"Error saving events: {e}")
     
@@ -194,12 +335,13 @@ class RealTimeYOLODetector:
             self.cap.release()
         cv2.destroyAllWindows()
         
-        # Save remaining events
-        if self.events_log:
-            self.save_events()
+        # Close the event log (events are already on disk)
+        if self._log_fh is not None:
+            self._log_fh.close()
+            self._log_fh = None
         
         print(f"🛑 Detection stopped. Total frames: {self.frame_count}")
-        print(f"📊 Total events logged: {len(self.events_log)}")
+        print(f"📊 Total events logged: {self.total_events}")
 
 def main():
     detector = RealTimeYOLODetector()